@@ -14,17 +14,73 @@ Usage:
 """
 
 import socket
+import selectors
+import errno
 import json
+import logging
+import math
+import orjson
+import os
+import platform
+import re
 import time
-import threading
 import argparse
 import csv
 import sys
+from collections import deque
 from datetime import datetime
-from typing import List, Dict, Optional
-from zeroconf import ServiceInfo, Zeroconf
+from itertools import islice
+from typing import List, Dict, Optional, Tuple, Union
+from zeroconf import InterfaceChoice, ServiceInfo, Zeroconf
 import ipaddress
+import numpy as np
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+log = logging.getLogger(__name__)
+
+# Resync playback clock when the broadcast loop falls this many update intervals behind
+MAX_LAG_INTERVALS = 3
+
+# Drop clients that have this much output queued without reading it
+MAX_PENDING_BYTES = 1024 * 1024
+
+# Scatter-gather writes, bounded well below IOV_MAX
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+SEND_MAX_CHUNKS = 64
+
+# io_uring broadcast path (--io-uring)
+IO_URING_MIN_KERNEL = (5, 10)
+IO_URING_ENTRIES = 256
+
+# Terminates every message sent to the app
+MESSAGE_TAIL = b'}\n'
+
+# Flight data point fields, stored column-wise by FlightSimulator
+FLIGHT_FIELDS = ("time", "lat", "lon", "alt", "temp", "humidity", "pressure", "climb")
+FLIGHT_DEFAULTS = {"climb": 0.0}
+CSV_REQUIRED_FIELDS = ("time", "lat", "lon", "alt")
+
+# Optional flight data fields and their JSON-RDZ message keys
+OPTIONAL_MESSAGE_FIELDS = (
+    ("temp", "temperature"),
+    ("humidity", "relativeHumidity"),
+    ("pressure", "pressure"),
+    ("climb", "climbRate"),
+)
 
 # Sample balloon flight data (ascending phase)
 SAMPLE_FLIGHT = [
@@ -46,178 +102,535 @@ SAMPLE_FLIGHT = [
 ]
 
 
+def flight_columns(flight_data: Union[List[Dict], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Convert flight points to one float64 array per field
+
+    Accepts a list of points or already column-wise data. Missing optional
+    values become NaN (or their FLIGHT_DEFAULTS value), missing timestamps
+    the point index.
+    """
+    if isinstance(flight_data, dict):
+        size = len(flight_data["lat"])
+        cols = {
+            name: np.array(flight_data[name], dtype=np.float64) if name in flight_data else np.full(size, np.nan)
+            for name in FLIGHT_FIELDS
+        }
+    else:
+        cols = {
+            name: np.array([point.get(name) for point in flight_data], dtype=np.float64)
+            for name in FLIGHT_FIELDS
+        }
+
+    for name, default in FLIGHT_DEFAULTS.items():
+        cols[name][np.isnan(cols[name])] = default
+
+    no_time = np.isnan(cols["time"])
+    cols["time"][no_time] = np.flatnonzero(no_time)
+    return cols
+
+
+def message_frames(cols: Dict[str, np.ndarray]) -> List[List[float]]:
+    """Gather the message values of every flight point in one batch
+
+    Rows are lat, lon, alt and then OPTIONAL_MESSAGE_FIELDS, as plain floats
+    so building a message needs no per-field column lookups or NumPy scalars.
+    """
+    fields = ["lat", "lon", "alt"] + [field for field, _ in OPTIONAL_MESSAGE_FIELDS]
+    return np.column_stack([cols[field] for field in fields]).tolist()
+
+
 class FlightSimulator:
     """Manages flight data playback"""
 
-    def __init__(self, flight_data: List[Dict], speed: float = 1.0, loop: bool = True):
-        self.flight_data = flight_data
+    def __init__(self, flight_data: Union[List[Dict], Dict[str, np.ndarray]], speed: float = 1.0, loop: bool = True):
+        self.cols = flight_columns(flight_data)
+        self.num_points = len(self.cols["lat"])
+        self._frames = message_frames(self.cols)
         self.speed = speed
         self.loop = loop
         self.current_index = 0
-        self.sonde_id = "S2260991"
-        self.sonde_type = "RS41"
-        self.freq = "402.300"
-
-    def get_next_point(self) -> Optional[Dict]:
-        """Get next flight data point with proper JSON-RDZ formatting"""
-        if self.current_index >= len(self.flight_data):
-            if self.loop:
-                self.current_index = 0
-            else:
-                return None
-
-        point = self.flight_data[self.current_index]
-        self.current_index += 1
-
-        # Build JSON-RDZ message matching the protocol
+        self._sonde_id = "S2260991"
+        self._sonde_type = "RS41"
+        self._freq = "402.300"
+        self._clear_messages()
+
+    @property
+    def sonde_id(self) -> str:
+        return self._sonde_id
+
+    @sonde_id.setter
+    def sonde_id(self, value: str):
+        self._sonde_id = value
+        self._clear_messages()
+
+    @property
+    def sonde_type(self) -> str:
+        return self._sonde_type
+
+    @sonde_type.setter
+    def sonde_type(self, value: str):
+        self._sonde_type = value
+        self._clear_messages()
+
+    @property
+    def freq(self) -> str:
+        return self._freq
+
+    @freq.setter
+    def freq(self, value: str):
+        self._freq = value
+        self._clear_messages()
+
+    def _build_message(self, index: int) -> Dict:
+        """Build JSON-RDZ message for a flight data point"""
+        lat, lon, alt, *optional = self._frames[index]
         msg = {
             "id": self.sonde_id,
             "type": self.sonde_type,
-            "lat": point["lat"],
-            "lon": point["lon"],
-            "alt": point["alt"],
+            "lat": lat,
+            "lon": lon,
+            "alt": alt,
             "validPos": 3,  # lat and lon valid (bits 0,1)
             "validId": 1,
             "res": 0,  # success
             "freq": self.freq,
-            "temperature": point.get("temp"),
-            "relativeHumidity": point.get("humidity"),
-            "pressure": point.get("pressure"),
-            "climbRate": point.get("climb", 0),
-            "batteryVoltage": 3.1,
-            "rssi": -95,
-            "frameNumber": self.current_index,
         }
 
-        # Remove None values
-        return {k: v for k, v in msg.items() if v is not None}
+        # Optional sensor values, only sent when present
+        for (_, key), value in zip(OPTIONAL_MESSAGE_FIELDS, optional):
+            if not math.isnan(value):
+                msg[key] = value
+
+        msg["batteryVoltage"] = 3.1
+        msg["rssi"] = -95
+        msg["frameNumber"] = index + 1
+        return msg
+
+    def _clear_messages(self):
+        """Drop serialized messages, called when a field they contain changes"""
+        self._messages: List[Optional[bytes]] = [None] * self.num_points
+
+    def get_next_point(self) -> Optional[int]:
+        """Advance playback, returns index of the next flight data point"""
+        if self.current_index >= self.num_points:
+            if self.loop:
+                self.current_index = 0
+            else:
+                return None
+
+        index = self.current_index
+        self.current_index += 1
+        return index
+
+    def get_message(self, index: int) -> bytes:
+        """Get serialized JSON-RDZ message for a flight data point
+
+        Serialized on first use and cached, flight data is static during
+        playback so later loops only index into the cache.
+        """
+        message = self._messages[index]
+        if message is None:
+            message = orjson.dumps(self._build_message(index)) + MESSAGE_TAIL
+            self._messages[index] = message
+        return message
+
+    def get_batch_message(self, indexes: List[int]) -> bytes:
+        """Get several flight data points as one JSON array message"""
+        # Gather the frames and separators, joined with a single copy
+        tail = len(MESSAGE_TAIL)
+        parts = [b'[']
+        for i in indexes:
+            parts.append(memoryview(self.get_message(i))[:-tail])
+            parts.append(b',')
+        parts[-1] = b']' + MESSAGE_TAIL
+        return b''.join(parts)
 
     def get_update_interval(self) -> float:
         """Calculate sleep time between updates based on speed multiplier"""
-        if self.current_index >= len(self.flight_data):
+        if self.current_index >= self.num_points:
             return 1.0 / self.speed
 
         if self.current_index == 0:
             return 0.1  # First point immediately
 
-        curr = self.flight_data[self.current_index]
-        prev = self.flight_data[self.current_index - 1]
-        time_delta = curr.get("time", self.current_index) - prev.get("time", self.current_index - 1)
+        times = self.cols["time"]
+        time_delta = float(times[self.current_index] - times[self.current_index - 1])
 
         return max(0.1, time_delta / self.speed)
 
 
+def send_chunks(sock: socket.socket, chunks: List[bytes]) -> int:
+    """Write several buffers with a single syscall where the platform allows"""
+    if HAS_SENDMSG:
+        return sock.sendmsg(chunks)
+    return sock.send(b"".join(chunks))
+
+
+class ClientConnection:
+    """Per-client socket state for the selector loop"""
+
+    def __init__(self, sock: socket.socket, address):
+        self.sock = sock
+        self.address = address
+        self.inbuf = bytearray()
+        self.outbuf = deque()  # shared message bytes, written with one sendmsg
+        self.pending = 0
+        self.inflight = False  # io_uring send of outbuf[0] not completed yet
+        self.events = selectors.EVENT_READ  # interest registered with the selector
+        self.closed = False
+
+    def consume(self, sent: int):
+        """Drop bytes the socket accepted from the output queue"""
+        self.pending -= sent
+        while sent:
+            head = self.outbuf[0]
+            if sent < len(head):
+                # View of the unsent rest, shared message bytes aren't copied
+                self.outbuf[0] = memoryview(head)[sent:]
+                break
+            self.outbuf.popleft()
+            sent -= len(head)
+
+
+def io_uring_unavailable() -> Optional[str]:
+    """Reason the io_uring send path can't be used, None if it can"""
+    if liburing is None:
+        return "liburing is not installed"
+    if platform.system() != "Linux" or not hasattr(os, "eventfd"):
+        return "requires Linux and Python 3.10+"
+
+    match = re.match(r"(\d+)\.(\d+)", platform.release())
+    if not match or tuple(map(int, match.groups())) < IO_URING_MIN_KERNEL:
+        return "requires Linux kernel %d.%d or newer" % IO_URING_MIN_KERNEL
+    return None
+
+
+def check_uring(ret: int) -> int:
+    """Raise OSError for a negative errno returned by a liburing call"""
+    if ret < 0:
+        raise OSError(-ret, os.strerror(-ret))
+    return ret
+
+
+class UringSender:
+    """Submits the sends of one broadcast for all clients with a single io_uring_submit
+
+    Written against the liburing 2024.5.3 bindings, which return negative
+    errno values instead of raising.
+    """
+
+    def __init__(self, entries: int = IO_URING_ENTRIES):
+        self.ring = liburing.io_uring()
+        self.cqe = liburing.io_uring_cqe()
+        check_uring(liburing.io_uring_queue_init(entries, self.ring, 0))
+
+        # Signalled on every completion, watched by the selector loop
+        self.eventfd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        try:
+            check_uring(liburing.io_uring_register_eventfd(self.ring, self.eventfd))
+        except OSError:
+            os.close(self.eventfd)
+            liburing.io_uring_queue_exit(self.ring)
+            raise
+
+        self.inflight: Dict[int, Tuple[ClientConnection, bytes]] = {}
+        self.next_token = 0
+
+    def send(self, conns: List[ClientConnection]) -> List[ClientConnection]:
+        """Send each client's head buffer, returns clients that didn't fit in the ring"""
+        overflow = []
+        for conn in conns:
+            # A full submission queue gives a falsy sqe, not None
+            sqe = liburing.io_uring_get_sqe(self.ring)
+            if not sqe:
+                overflow.append(conn)
+                continue
+
+            data = conn.outbuf[0]
+            liburing.io_uring_prep_send(sqe, conn.sock.fileno(), data, len(data), 0)
+            liburing.io_uring_sqe_set_data64(sqe, self.next_token)
+
+            # Keep data referenced until the kernel is done with it
+            self.inflight[self.next_token] = (conn, data)
+            self.next_token += 1
+            conn.inflight = True
+
+        check_uring(liburing.io_uring_submit(self.ring))
+        return overflow
+
+    def completions(self):
+        """Reap finished sends, yields (client, result) pairs"""
+        try:
+            os.eventfd_read(self.eventfd)
+        except BlockingIOError:
+            pass
+
+        # peek returns -EAGAIN once the completion queue is empty
+        while liburing.io_uring_peek_cqe(self.ring, self.cqe) == 0:
+            entry = self.cqe[0]
+            token, res = entry.user_data, entry.res
+            liburing.io_uring_cqe_seen(self.ring, entry)
+
+            conn, _ = self.inflight.pop(token)
+            conn.inflight = False
+            yield conn, res
+
+    def close(self):
+        liburing.io_uring_queue_exit(self.ring)
+        os.close(self.eventfd)
+
+
+def local_ipv4_addresses() -> List[str]:
+    """Non-loopback IPv4 addresses of all network interfaces"""
+    if psutil is None:
+        return []
+
+    return [
+        addr.address
+        for addrs in psutil.net_if_addrs().values()
+        for addr in addrs
+        if addr.family == socket.AF_INET and not ipaddress.ip_address(addr.address).is_loopback
+    ]
+
+
+def outbound_ipv4_address() -> str:
+    """Address of the interface routing to the internet, no packets are sent"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(("8.8.8.8", 80))
+        return s.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+    finally:
+        s.close()
+
+
 class TTGOSimulator:
     """Main simulator server"""
 
-    def __init__(self, port: int = 12345, host: str = "0.0.0.0", service_name: str = "TTGO Simulator"):
+    def __init__(self, port: int = 12345, host: str = "0.0.0.0", service_name: str = "TTGO Simulator",
+                 io_uring: bool = False, batch: int = 1):
         self.port = port
         self.host = host
         self.service_name = service_name
+        self.io_uring = io_uring
+        self.batch = batch
         self.running = False
-        self.clients = []
-        self.lock = threading.Lock()
+        # Immutable, replaced on connect and disconnect, so loops over it
+        # never see it change even when they drop a client
+        self.clients: Tuple[ClientConnection, ...] = ()
+        self.selector = None
+        self.uring = None
         self.zeroconf = None
         self.service_info = None
+        self.local_ips = None
 
     def start_mdns(self):
         """Advertise service via mDNS"""
-        self.zeroconf = Zeroconf()
+        self.zeroconf = Zeroconf(interfaces=InterfaceChoice.All)
 
-        # Get local IP address
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-        except:
-            local_ip = "127.0.0.1"
-        finally:
-            s.close()
+        # Get local IP addresses, advertised on every interface so
+        # multi-homed hosts (e.g. Wi-Fi plus VPN) are found on all of them
+        if self.local_ips is None:
+            self.local_ips = local_ipv4_addresses() or [outbound_ipv4_address()]
 
-        # Convert IP to bytes
-        ip_bytes = socket.inet_aton(local_ip)
+        # Convert IPs to bytes
+        ip_bytes_list = [socket.inet_aton(ip) for ip in self.local_ips]
 
         self.service_info = ServiceInfo(
             "_jsonrdz._tcp.local.",
             f"{self.service_name}._jsonrdz._tcp.local.",
-            addresses=[ip_bytes],
+            addresses=ip_bytes_list,
             port=self.port,
             properties={},
             server=f"{self.service_name.replace(' ', '-').lower()}.local."
         )
 
-        print(f"[mDNS] Advertising service: {self.service_name}")
-        print(f"[mDNS] Type: _jsonrdz._tcp.local.")
-        print(f"[mDNS] Address: {local_ip}:{self.port}")
+        log.info("[mDNS] Advertising service: %s", self.service_name)
+        log.info("[mDNS] Type: _jsonrdz._tcp.local.")
+        for ip in self.local_ips:
+            log.info("[mDNS] Address: %s:%d", ip, self.port)
 
         self.zeroconf.register_service(self.service_info)
 
     def stop_mdns(self):
         """Stop mDNS advertisement"""
         if self.zeroconf and self.service_info:
-            print("[mDNS] Unregistering service...")
+            log.info("[mDNS] Unregistering service...")
             self.zeroconf.unregister_service(self.service_info)
             self.zeroconf.close()
 
-    def handle_client(self, client_socket: socket.socket, address):
-        """Handle individual client connection"""
-        print(f"[Client] Connected: {address}")
-
-        with self.lock:
-            self.clients.append(client_socket)
-
+    def start_io_uring(self):
+        """Switch broadcasts to io_uring sends, falling back to plain sockets"""
+        reason = io_uring_unavailable()
+        if reason is None:
+            try:
+                self.uring = UringSender()
+            except (OSError, AttributeError) as e:
+                # AttributeError: a liburing release with a different API
+                reason = str(e)
+
+        if reason is not None:
+            log.warning("[Server] io_uring unavailable (%s), using sockets", reason)
+            return
+
+        self.selector.register(self.uring.eventfd, selectors.EVENT_READ)
+        log.info("[Server] Broadcasting via io_uring")
+
+    def accept_clients(self, server_socket: socket.socket):
+        """Accept all pending connections and register them with the selector"""
+        while True:
+            try:
+                client_socket, address = server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # e.g. ECONNABORTED or EMFILE, keep serving everyone else
+                log.error("[Error] Accept failed: %s", e)
+                return
+
+            try:
+                client_socket.setblocking(False)
+                # Send each message right away instead of waiting on Nagle's
+                # algorithm, messages are small and one per update
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                conn = ClientConnection(client_socket, address)
+                self.selector.register(client_socket, selectors.EVENT_READ, conn)
+            except OSError as e:
+                log.error("[Error] Accept failed for %s: %s", address, e)
+                client_socket.close()
+                continue
+
+            log.info("[Client] Connected: %s", address)
+            self.clients += (conn,)
+
+    def close_client(self, conn: "ClientConnection"):
+        """Drop a client connection"""
+        if conn.closed:
+            return
+
+        conn.closed = True
+        self.clients = tuple(c for c in self.clients if c is not conn)
+
+        self.selector.unregister(conn.sock)
+        conn.sock.close()
+        log.info("[Client] Disconnected: %s", conn.address)
+
+    def update_interest(self, conn: "ClientConnection"):
+        """Watch for writability only on clients with pending output
+        that isn't already being sent through io_uring"""
+        if conn.closed:
+            return
+
+        events = selectors.EVENT_READ
+        if conn.outbuf and not conn.inflight:
+            events |= selectors.EVENT_WRITE
+        if events != conn.events:
+            conn.events = events
+            self.selector.modify(conn.sock, events, conn)
+
+    def read_client(self, conn: "ClientConnection"):
+        """Handle incoming data (GPS positions from app)"""
         try:
-            # Read incoming data (GPS positions from app)
-            client_socket.settimeout(1.0)
-            buffer = b""
-
-            while self.running:
-                try:
-                    data = client_socket.recv(1024)
-                    if not data:
-                        break
-
-                    buffer += data
-                    while b'\n' in buffer:
-                        line, buffer = buffer.split(b'\n', 1)
-                        try:
-                            msg = json.loads(line.decode('iso-8859-1'))
-                            if "lat" in msg and "lon" in msg:
-                                print(f"[Client] Received GPS: lat={msg['lat']:.4f}, lon={msg['lon']:.4f}, alt={msg.get('alt', 0):.1f}m")
-                            elif "status" in msg:
-                                print(f"[Client] Keepalive received")
-                        except json.JSONDecodeError:
-                            pass
-
-                except socket.timeout:
+            data = conn.sock.recv(1024)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self.close_client(conn)
+            return
+
+        conn.inbuf += data
+        start = 0
+        while (end := conn.inbuf.find(b'\n', start)) >= 0:
+            line = conn.inbuf[start:end]
+            start = end + 1
+            try:
+                msg = orjson.loads(line)
+                if not isinstance(msg, dict):
                     continue
-                except Exception as e:
-                    break
-
-        finally:
-            with self.lock:
-                if client_socket in self.clients:
-                    self.clients.remove(client_socket)
-
-            client_socket.close()
-            print(f"[Client] Disconnected: {address}")
-
-    def broadcast_data(self, data: Dict):
-        """Send data to all connected clients"""
-        json_str = json.dumps(data, separators=(',', ':'))
-        message = json_str.encode('iso-8859-1') + b'}\n'
-
-        with self.lock:
-            dead_clients = []
-            for client in self.clients:
-                try:
-                    client.send(message)
-                except:
-                    dead_clients.append(client)
-
-            for client in dead_clients:
-                self.clients.remove(client)
-                client.close()
+                if "lat" in msg and "lon" in msg:
+                    log.info("[Client] Received GPS: lat=%.4f, lon=%.4f, alt=%.1fm",
+                             float(msg['lat']), float(msg['lon']), float(msg.get('alt', 0)))
+                elif "status" in msg:
+                    log.debug("[Client] Keepalive received")
+            except orjson.JSONDecodeError:
+                pass
+            except (TypeError, ValueError) as e:
+                log.warning("[Client] Invalid message from %s: %s", conn.address, e)
+                self.close_client(conn)
+                return
+
+        # Drop all complete lines with a single move of the remainder
+        del conn.inbuf[:start]
+
+    def write_client(self, conn: "ClientConnection"):
+        """Flush as much pending output as the socket accepts"""
+        chunks = list(islice(conn.outbuf, SEND_MAX_CHUNKS))
+        try:
+            sent = send_chunks(conn.sock, chunks)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self.close_client(conn)
+            return
+
+        conn.consume(sent)
+        self.update_interest(conn)
+
+    def reap_sends(self):
+        """Handle completed io_uring sends"""
+        for conn, res in self.uring.completions():
+            if conn.closed:
+                continue  # closed while the send was in flight
+            if res < 0 and res != -errno.EAGAIN:
+                self.close_client(conn)
+                continue
+            if res > 0:
+                conn.consume(res)
+            # Rest of the output, or a send that found the socket full,
+            # is flushed by poll() once the socket is writable
+            self.update_interest(conn)
+
+    def poll(self, server_socket: socket.socket, timeout: float):
+        """Serve accepts, reads and writes that are ready within timeout"""
+        for key, events in self.selector.select(timeout):
+            if key.fileobj is server_socket:
+                self.accept_clients(server_socket)
+                continue
+            if self.uring and key.fileobj == self.uring.eventfd:
+                self.reap_sends()
+                continue
+
+            conn = key.data
+            if events & selectors.EVENT_READ:
+                self.read_client(conn)
+            if events & selectors.EVENT_WRITE and not conn.closed and not conn.inflight:
+                self.write_client(conn)
+
+    def broadcast_data(self, message: bytes):
+        """Send serialized message to all connected clients"""
+        ready = []
+        for conn in self.clients:
+            if conn.pending > MAX_PENDING_BYTES:
+                log.warning("[Client] Not reading, dropping: %s", conn.address)
+                self.close_client(conn)
+                continue
+
+            conn.outbuf.append(message)
+            conn.pending += len(message)
+            # Write right away unless older output is still waiting
+            # for the socket, which poll() flushes once it's writable,
+            # a partial write arms that in write_client()
+            if len(conn.outbuf) == 1:
+                ready.append(conn)
+
+        if self.uring:
+            ready = self.uring.send(ready)
+        for conn in ready:
+            self.write_client(conn)
 
     def run(self, flight_sim: FlightSimulator):
         """Main server loop"""
@@ -231,63 +644,79 @@ class TTGOSimulator:
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         server_socket.bind((self.host, self.port))
         server_socket.listen(5)
-        server_socket.settimeout(1.0)
+        server_socket.setblocking(False)
 
-        print(f"[Server] Listening on {self.host}:{self.port}")
-        print(f"[Server] Sonde ID: {flight_sim.sonde_id}, Type: {flight_sim.sonde_type}")
-        print(f"[Server] Flight data points: {len(flight_sim.flight_data)}")
-        print(f"[Server] Playback speed: {flight_sim.speed}x")
-        print(f"[Server] Press Ctrl+C to stop\n")
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(server_socket, selectors.EVENT_READ)
 
-        # Accept connections in background thread
-        def accept_connections():
-            while self.running:
-                try:
-                    client_socket, address = server_socket.accept()
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, address),
-                        daemon=True
-                    )
-                    client_thread.start()
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    if self.running:
-                        print(f"[Error] Accept failed: {e}")
+        if self.io_uring:
+            self.start_io_uring()
 
-        accept_thread = threading.Thread(target=accept_connections, daemon=True)
-        accept_thread.start()
+        log.info("[Server] Listening on %s:%d", self.host, self.port)
+        log.info("[Server] Sonde ID: %s, Type: %s", flight_sim.sonde_id, flight_sim.sonde_type)
+        log.info("[Server] Flight data points: %d", flight_sim.num_points)
+        log.info("[Server] Playback speed: %sx", flight_sim.speed)
+        log.info("[Server] Press Ctrl+C to stop\n")
 
-        # Main data broadcast loop
+        # Main event loop: client IO is served while waiting for the next
+        # broadcast, which is paced against absolute deadlines so
+        # oversleeping on one tick doesn't push back all following ones
+        next_deadline = time.monotonic()
         try:
             while self.running:
-                point = flight_sim.get_next_point()
-                if point is None:
-                    print("[Simulation] Flight complete, stopping...")
+                now = time.monotonic()
+                if now < next_deadline:
+                    self.poll(server_socket, next_deadline - now)
+                    continue
+
+                # Advance one point, or up to batch points sent as one message
+                indexes = []
+                interval = 0.0
+                while len(indexes) < self.batch:
+                    index = flight_sim.get_next_point()
+                    if index is None:
+                        break
+                    indexes.append(index)
+                    interval += flight_sim.get_update_interval()
+
+                if not indexes:
+                    log.info("[Simulation] Flight complete, stopping...")
                     break
 
                 # Broadcast to all clients
                 if self.clients:
-                    self.broadcast_data(point)
-                    print(f"[Data] alt={point['alt']:5.0f}m, lat={point['lat']:.4f}, lon={point['lon']:.4f}, "
-                          f"climb={point.get('climbRate', 0):+.1f}m/s → {len(self.clients)} client(s)")
-
-                # Wait before next update
-                time.sleep(flight_sim.get_update_interval())
+                    if self.batch == 1:
+                        message = flight_sim.get_message(indexes[0])
+                    else:
+                        message = flight_sim.get_batch_message(indexes)
+                    self.broadcast_data(message)
+                    if log.isEnabledFor(logging.INFO):
+                        index = indexes[-1]
+                        cols = flight_sim.cols
+                        log.info("[Data] alt=%5.0fm, lat=%.4f, lon=%.4f, climb=%+.1fm/s → %d client(s)",
+                                 cols['alt'][index], cols['lat'][index], cols['lon'][index],
+                                 cols['climb'][index], len(self.clients))
+
+                # Schedule next update
+                next_deadline += interval
+                if now - next_deadline > MAX_LAG_INTERVALS * interval:
+                    # Fell too far behind, resync instead of bursting to catch up
+                    next_deadline = now
 
         except KeyboardInterrupt:
-            print("\n[Server] Shutting down...")
+            log.info("\n[Server] Shutting down...")
 
         finally:
             self.running = False
+            self.selector.close()
+            if self.uring:
+                self.uring.close()
             server_socket.close()
             self.stop_mdns()
 
-            with self.lock:
-                for client in self.clients:
-                    client.close()
-                self.clients.clear()
+            for conn in self.clients:
+                conn.sock.close()
+            self.clients = ()
 
 
 def load_flight_from_json(filepath: str) -> List[Dict]:
@@ -304,11 +733,20 @@ def load_flight_from_json(filepath: str) -> List[Dict]:
         raise ValueError("JSON must be array of points or object with 'points' key")
 
 
-def load_flight_from_csv(filepath: str) -> List[Dict]:
+def load_flight_from_csv(filepath: str) -> Union[List[Dict], Dict[str, np.ndarray]]:
     """Load flight data from CSV file
 
     Expected columns: time,lat,lon,alt[,temp,humidity,pressure,climb]
+
+    Parsed column-wise with pandas when it is installed, point by point otherwise.
     """
+    if pd is not None:
+        df = pd.read_csv(filepath, usecols=lambda name: name in FLIGHT_FIELDS, dtype=np.float64)
+        missing = [name for name in CSV_REQUIRED_FIELDS if name not in df.columns]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+        return {name: df[name].to_numpy() for name in df.columns}
+
     flight_data = []
     with open(filepath, 'r') as f:
         reader = csv.DictReader(f)
@@ -320,15 +758,10 @@ def load_flight_from_csv(filepath: str) -> List[Dict]:
                 "alt": float(row["alt"]),
             }
 
-            # Optional fields
-            if "temp" in row:
-                point["temp"] = float(row["temp"])
-            if "humidity" in row:
-                point["humidity"] = float(row["humidity"])
-            if "pressure" in row:
-                point["pressure"] = float(row["pressure"])
-            if "climb" in row:
-                point["climb"] = float(row["climb"])
+            # Optional fields, empty or short rows count as missing
+            for name in ("temp", "humidity", "pressure", "climb"):
+                if row.get(name):
+                    point[name] = float(row[name])
 
             flight_data.append(point)
 
@@ -357,25 +790,43 @@ Examples:
     parser.add_argument('--name', '-n', type=str, default='TTGO Simulator', help='mDNS service name')
     parser.add_argument('--id', type=str, default='S2260991', help='Sonde ID (default: S2260991)')
     parser.add_argument('--type', '-t', type=str, default='RS41', help='Sonde type (default: RS41)')
+    parser.add_argument('--batch', '-b', type=int, default=1,
+                        help='Send this many points per message as a JSON array, for high speed replay (default: 1)')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Only log warnings and errors')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Also log keepalives')
+    parser.add_argument('--io-uring', action='store_true', help='Batch broadcast sends through io_uring (Linux, needs liburing)')
 
     args = parser.parse_args()
+    if args.batch < 1:
+        parser.error("--batch must be at least 1")
+
+    if args.quiet:
+        level = logging.WARNING
+    elif args.verbose:
+        level = logging.DEBUG
+    else:
+        level = logging.INFO
+    # Output goes to stdout as before, only this module's logger follows
+    # --verbose so zeroconf and asyncio debug output stays hidden
+    logging.basicConfig(level=max(level, logging.INFO), format="%(message)s", stream=sys.stdout)
+    log.setLevel(level)
 
     # Load flight data
     if args.flight:
-        print(f"[Init] Loading flight from: {args.flight}")
+        log.info("[Init] Loading flight from: %s", args.flight)
         try:
             if args.flight.endswith('.json'):
                 flight_data = load_flight_from_json(args.flight)
             elif args.flight.endswith('.csv'):
                 flight_data = load_flight_from_csv(args.flight)
             else:
-                print("Error: Flight file must be .json or .csv")
+                log.error("Error: Flight file must be .json or .csv")
                 return 1
         except Exception as e:
-            print(f"Error loading flight data: {e}")
+            log.error("Error loading flight data: %s", e)
             return 1
     else:
-        print("[Init] Using built-in sample flight")
+        log.info("[Init] Using built-in sample flight")
         flight_data = SAMPLE_FLIGHT
 
     # Create simulator
@@ -383,7 +834,8 @@ Examples:
     flight_sim.sonde_id = args.id
     flight_sim.sonde_type = args.type
 
-    server = TTGOSimulator(port=args.port, host=args.host, service_name=args.name)
+    server = TTGOSimulator(port=args.port, host=args.host, service_name=args.name, io_uring=args.io_uring,
+                           batch=args.batch)
 
     # Run
     server.run(flight_sim)